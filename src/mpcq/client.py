@@ -1,11 +1,28 @@
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import cached_property, lru_cache
+from typing import (
+    Any,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
-import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
+import quivr as qv
 from adam_core.time import Timestamp
-from astropy.time import Time
-from google.cloud import bigquery
+from google.cloud import bigquery, bigquery_storage
 
 from .observations import MPCObservations
 from .orbits import MPCOrbits, MPCPrimaryObjects
@@ -14,6 +31,474 @@ from .submissions import (
     MPCSubmissionResults,
     infer_submission_time,
 )
+from .utils import timestamp_from_arrow
+
+# Resolves each requested designation to its primary provisional designation and,
+# for numbered objects, its permanent designation. Shared by the queries that take a
+# list of designations through the {requested_identifications} placeholder.
+_REQUESTED_IDENTIFICATIONS_CTE = """requested_identifications AS (
+    SELECT
+        requested_provid,
+        ci.unpacked_primary_provisional_designation AS primary_provid,
+        ni.permid,
+        COALESCE(
+            ni.permid, ci.unpacked_primary_provisional_designation
+        ) AS primary_designation
+    FROM UNNEST(@provids) AS requested_provid
+    LEFT JOIN `{dataset_id}.public_current_identifications` AS ci
+        ON ci.unpacked_secondary_provisional_designation = requested_provid
+    LEFT JOIN `{dataset_id}.public_numbered_identifications` AS ni
+        ON ci.unpacked_primary_provisional_designation = ni.unpacked_primary_provisional_designation
+)"""
+
+
+_OBSERVATIONS_SQL = """
+WITH {requested_identifications},
+observation_matches AS (
+    -- Observations are matched to a designation by its primary provisional
+    -- designation, any of its secondary designations, or its permanent designation.
+    -- Each match is a separate equi-join (rather than one join on an OR of the
+    -- three) so BigQuery can run them as hash joins; duplicates are dropped below.
+    SELECT ri.requested_provid, obs_sbn.obsid
+    FROM requested_identifications AS ri
+    INNER JOIN `{dataset_id}.public_obs_sbn` AS obs_sbn
+        ON ri.primary_provid = obs_sbn.provid{observation_filter}
+    UNION ALL
+    SELECT ri.requested_provid, obs_sbn.obsid
+    FROM requested_identifications AS ri
+    INNER JOIN `{dataset_id}.public_current_identifications` AS ci_alt
+        ON ri.primary_provid = ci_alt.unpacked_primary_provisional_designation
+    INNER JOIN `{dataset_id}.public_obs_sbn` AS obs_sbn
+        ON ci_alt.unpacked_secondary_provisional_designation = obs_sbn.provid{observation_filter}
+    UNION ALL
+    SELECT ri.requested_provid, obs_sbn.obsid
+    FROM requested_identifications AS ri
+    INNER JOIN `{dataset_id}.public_obs_sbn` AS obs_sbn
+        ON ri.permid = obs_sbn.permid{observation_filter}
+)
+SELECT * EXCEPT (rn)
+FROM (
+    SELECT
+        ri.requested_provid,
+        ri.primary_designation,
+        obs_sbn.obsid,
+        obs_sbn.trksub,
+        obs_sbn.permid,
+        obs_sbn.provid,
+        obs_sbn.submission_id,
+        obs_sbn.obssubid,
+        obs_sbn.obstime,
+        obs_sbn.ra,
+        obs_sbn.dec,
+        obs_sbn.rmsra,
+        obs_sbn.rmsdec,
+        obs_sbn.mag,
+        obs_sbn.rmsmag,
+        obs_sbn.band,
+        obs_sbn.stn,
+        obs_sbn.updated_at,
+        obs_sbn.created_at,
+        obs_sbn.status,
+        ROW_NUMBER() OVER (
+            PARTITION BY ri.requested_provid, obs_sbn.obsid
+        ) AS rn
+    FROM requested_identifications AS ri
+    LEFT JOIN observation_matches AS om
+        ON ri.requested_provid = om.requested_provid
+    LEFT JOIN `{dataset_id}.public_obs_sbn` AS obs_sbn
+        ON om.obsid = obs_sbn.obsid{observation_filter}
+)
+WHERE rn = 1;
+"""
+
+# Optional filters on the matched observations, filled into {observation_filter}.
+# They are part of the join conditions so requested designations without matching
+# observations are still returned. A constant range on obstime also lets BigQuery
+# prune the storage blocks of public_obs_sbn that fall outside of it.
+_OBSTIME_FILTER = """
+        AND obs_sbn.obstime BETWEEN @obstime_min AND @obstime_max"""
+_BAND_FILTER = """
+        AND obs_sbn.band IN UNNEST(@bands)"""
+
+
+_ALL_ORBITS_SQL = """
+SELECT
+    mpc_orbits.id, 
+    mpc_orbits.unpacked_primary_provisional_designation AS provid, 
+    mpc_orbits.epoch_mjd,
+    mpc_orbits.q, 
+    mpc_orbits.e,
+    mpc_orbits.i, 
+    mpc_orbits.node,
+    mpc_orbits.argperi,
+    mpc_orbits.peri_time,
+    mpc_orbits.q_unc,
+    mpc_orbits.e_unc,
+    mpc_orbits.i_unc,
+    mpc_orbits.node_unc,
+    mpc_orbits.argperi_unc,
+    mpc_orbits.peri_time_unc,
+    mpc_orbits.a1,
+    mpc_orbits.a2,
+    mpc_orbits.a3,
+    mpc_orbits.h,
+    mpc_orbits.g,
+    mpc_orbits.created_at,
+    mpc_orbits.updated_at
+FROM `{dataset_id}.public_mpc_orbits` AS mpc_orbits;
+"""
+
+
+_ORBITS_SQL = """
+WITH {requested_identifications}
+SELECT * EXCEPT (rn)
+FROM (
+    SELECT
+        ri.requested_provid,
+        ri.primary_designation,
+        mpc_orbits.id,
+        mpc_orbits.unpacked_primary_provisional_designation AS provid,
+        mpc_orbits.epoch_mjd,
+        mpc_orbits.q,
+        mpc_orbits.e,
+        mpc_orbits.i,
+        mpc_orbits.node,
+        mpc_orbits.argperi,
+        mpc_orbits.peri_time,
+        mpc_orbits.q_unc,
+        mpc_orbits.e_unc,
+        mpc_orbits.i_unc,
+        mpc_orbits.node_unc,
+        mpc_orbits.argperi_unc,
+        mpc_orbits.peri_time_unc,
+        mpc_orbits.a1,
+        mpc_orbits.a2,
+        mpc_orbits.a3,
+        mpc_orbits.h,
+        mpc_orbits.g,
+        mpc_orbits.created_at,
+        mpc_orbits.updated_at,
+        ROW_NUMBER() OVER (
+            PARTITION BY ri.requested_provid, mpc_orbits.id
+        ) AS rn
+    FROM requested_identifications AS ri
+    LEFT JOIN `{dataset_id}.public_mpc_orbits` AS mpc_orbits
+        ON ri.primary_provid = mpc_orbits.unpacked_primary_provisional_designation
+)
+WHERE rn = 1;
+"""
+
+
+_SUBMISSION_INFO_SQL = """
+WITH requested_submission_ids AS (
+    SELECT submission_id
+    FROM UNNEST(@submission_ids) AS submission_id
+),
+submission_observations AS (
+    SELECT
+        obsid,
+        obssubid,
+        trksub,
+        permid,
+        provid,
+        submission_id,
+        status
+    FROM `{dataset_id}.public_obs_sbn`
+    WHERE submission_id IN UNNEST(@submission_ids)
+)
+SELECT
+    sb.submission_id AS requested_submission_id,
+    obs_sbn.obsid,
+    obs_sbn.obssubid, 
+    obs_sbn.trksub, 
+    COALESCE(
+        ni.permid, ci.unpacked_primary_provisional_designation
+    ) AS primary_designation,
+    obs_sbn.permid, 
+    obs_sbn.provid, 
+    obs_sbn.submission_id, 
+    obs_sbn.status
+FROM requested_submission_ids AS sb
+LEFT JOIN submission_observations AS obs_sbn
+    ON sb.submission_id = obs_sbn.submission_id
+LEFT JOIN `{dataset_id}.public_current_identifications` AS ci
+    ON ci.unpacked_secondary_provisional_designation = obs_sbn.provid
+    OR ci.unpacked_primary_provisional_designation = obs_sbn.provid
+LEFT JOIN `{dataset_id}.public_numbered_identifications` AS ni
+    ON obs_sbn.permid = ni.permid;
+"""
+
+
+_SUBMISSION_HISTORY_SQL = """
+WITH {requested_identifications},
+submission_observations AS (
+    SELECT
+        ri.requested_provid,
+        ri.primary_designation,
+        obs_sbn.obsid,
+        obs_sbn.obstime,
+        obs_sbn.submission_id
+    FROM requested_identifications AS ri
+    LEFT JOIN `{dataset_id}.public_current_identifications` AS ci_alt
+        ON ri.primary_provid = ci_alt.unpacked_primary_provisional_designation
+    LEFT JOIN `{dataset_id}.public_obs_sbn` AS obs_sbn
+        ON ri.primary_provid = obs_sbn.provid
+        OR ci_alt.unpacked_secondary_provisional_designation = obs_sbn.provid
+        OR ri.permid = obs_sbn.permid
+)
+SELECT
+    requested_provid,
+    primary_designation,
+    submission_id,
+    COUNT(DISTINCT obsid) AS num_obs,
+    MIN(obstime) AS first_obs_time,
+    MAX(obstime) AS last_obs_time,
+    ROW_NUMBER() OVER (
+        PARTITION BY primary_designation
+        ORDER BY submission_id ASC NULLS LAST
+    ) = 1 AS first_submission,
+    ROW_NUMBER() OVER (
+        PARTITION BY primary_designation
+        ORDER BY submission_id DESC NULLS FIRST
+    ) = 1 AS last_submission
+FROM submission_observations
+GROUP BY requested_provid, primary_designation, submission_id;
+"""
+
+
+_PRIMARY_OBJECTS_SQL = """
+WITH {requested_identifications}
+SELECT * EXCEPT (rn)
+FROM (
+    SELECT
+        ri.requested_provid,
+        ri.primary_designation,
+        po.unpacked_primary_provisional_designation AS provid,
+        po.created_at,
+        po.updated_at,
+        ROW_NUMBER() OVER (
+            PARTITION BY
+                ri.requested_provid, po.unpacked_primary_provisional_designation
+        ) AS rn
+    FROM requested_identifications AS ri
+    LEFT JOIN `{dataset_id}.public_primary_objects` AS po
+        ON ri.primary_provid = po.unpacked_primary_provisional_designation
+)
+WHERE rn = 1;
+"""
+
+
+def _format_sql(template: str, dataset_id: str, **substitutions: str) -> str:
+    """
+    Fill in the dataset ID, the shared CTEs and any other substitutions of a query
+    template.
+    """
+    return template.format(
+        dataset_id=dataset_id,
+        requested_identifications=_REQUESTED_IDENTIFICATIONS_CTE.format(
+            dataset_id=dataset_id
+        ),
+        **substitutions,
+    )
+
+
+def _to_datetime(time: Timestamp) -> datetime:
+    """
+    Convert a single Timestamp to a UTC datetime (with microsecond precision) for use
+    as a TIMESTAMP query parameter.
+    """
+    if len(time) != 1:
+        raise ValueError(f"Expected a single time, got {len(time)}.")
+
+    time = time.rescale("utc")
+    return datetime(1858, 11, 17, tzinfo=timezone.utc) + timedelta(
+        days=time.days[0].as_py(), microseconds=time.nanos[0].as_py() // 1000
+    )
+
+
+def _select_columns(
+    query: str,
+    table_type: Type[qv.Table],
+    columns: List[str],
+    required: List[str],
+    renamed: Optional[dict[str, str]] = None,
+) -> str:
+    """
+    Restrict a query to the given columns of its table type. The query is wrapped in
+    an outer SELECT so BigQuery only scans, and only returns, the columns that are
+    actually needed. Columns that are always needed (such as sort keys) are added to
+    those requested.
+
+    Parameters
+    ----------
+    query : str
+        Query whose result columns are named after the table type's columns.
+    table_type : Type[qv.Table]
+        Table type the results are converted to.
+    columns : List[str]
+        Names of the table type's columns to return.
+    required : List[str]
+        Result columns to return regardless of those requested.
+    renamed : dict, optional
+        Result column names of table type columns that are derived from a
+        differently named result column.
+
+    Returns
+    -------
+    query : str
+        The restricted query.
+
+    Raises
+    ------
+    ValueError
+        If a requested column is not a column of the table type.
+    """
+    unknown = set(columns) - set(table_type.schema.names)
+    if unknown:
+        raise ValueError(
+            f"Unknown {table_type.__name__} columns: {', '.join(sorted(unknown))}"
+        )
+
+    renamed = renamed or {}
+    selected = dict.fromkeys(required + [renamed.get(c, c) for c in columns])
+    return "SELECT {columns}\nFROM ({query})".format(
+        columns=", ".join(f"`{c}`" for c in selected),
+        query=query.strip().rstrip(";"),
+    )
+
+
+class _QueryCache:
+    """
+    Least-recently-used cache of query results, bounded by the total size of the
+    cached tables in bytes. Entries older than the time-to-live are treated as
+    missing so that updates to the MPC database are eventually picked up. The cache
+    is safe to share between threads.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Maximum total size of the cached tables in bytes. Results larger than this
+        are never cached. Set to 0 to disable caching.
+    ttl : float, optional
+        Time-to-live of each entry in seconds. If None, entries never expire.
+    """
+
+    def __init__(self, max_bytes: int, ttl: Optional[float]) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, Tuple[float, pa.Table]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[pa.Table]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            created, table = entry
+            if self.ttl is not None and time.monotonic() - created > self.ttl:
+                self._pop(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return table
+
+    def put(self, key: Hashable, table: pa.Table) -> None:
+        if self.max_bytes <= 0 or table.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+            self._entries[key] = (time.monotonic(), table)
+            self._nbytes += table.nbytes
+            while self._nbytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def items(self) -> List[Tuple[Hashable, pa.Table]]:
+        """
+        Return the unexpired entries, from least to most recently used.
+        """
+        with self._lock:
+            now = time.monotonic()
+            return [
+                (key, table)
+                for key, (created, table) in self._entries.items()
+                if self.ttl is None or now - created <= self.ttl
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def _pop(self, key: Hashable) -> None:
+        _, table = self._entries.pop(key)
+        self._nbytes -= table.nbytes
+
+
+@lru_cache(maxsize=8)
+def _shared_client(**kwargs: Any) -> bigquery.Client:
+    """
+    BigQuery client shared by every BigQueryMPCClient created with the same
+    arguments, so that credentials are looked up and connections are opened once
+    per process rather than once per instance.
+    """
+    return bigquery.Client(**kwargs)
+
+
+@lru_cache(maxsize=8)
+def _shared_bqstorage_client(credentials: Any) -> bigquery_storage.BigQueryReadClient:
+    """
+    BigQuery Storage Read API client shared by every BigQueryMPCClient created with
+    the same credentials, so that its gRPC channel is reused across instances.
+    """
+    return bigquery_storage.BigQueryReadClient(  # type: ignore[no-untyped-call]
+        credentials=credentials
+    )
+
+
+T = TypeVar("T", bound=qv.Table)
+
+_QueryParameter = Union[bigquery.ArrayQueryParameter, bigquery.ScalarQueryParameter]
+
+# Query text and (name, type, sorted values) of each parameter
+_CacheKey = Tuple[str, Tuple[Tuple[str, str, Tuple[Any, ...]], ...]]
+
+
+def _from_arrow(table_type: Type[T], table: pa.Table, **columns: Any) -> T:
+    """
+    Build a quivr table from query results. Each column of the table type that
+    appears in the results is taken by name, with Arrow timestamp columns converted
+    to Timestamps. Columns that are renamed or derived are passed as keyword
+    arguments and take precedence over the results.
+
+    Parameters
+    ----------
+    table_type : Type[qv.Table]
+        Table type to build.
+    table : pa.Table
+        Query results.
+    **columns
+        Columns to use instead of (or in addition to) those in the results.
+
+    Returns
+    -------
+    table : qv.Table
+        The query results as the given table type.
+    """
+    for name in table_type.schema.names:
+        if name in columns or name not in table.column_names:
+            continue
+
+        column = table.column(name)
+        if pa.types.is_timestamp(column.type):
+            column = timestamp_from_arrow(column)
+        columns[name] = column
+
+    return table_type.from_kwargs(**columns)
 
 
 class MPCClient(ABC):
@@ -110,11 +595,369 @@ class MPCClient(ABC):
 
 class BigQueryMPCClient(MPCClient):
 
-    def __init__(self, **kwargs: dict[str, Any]) -> None:
-        self.client = bigquery.Client(**kwargs)
+    def __init__(
+        self,
+        cache_max_bytes: int = 0,
+        cache_ttl: Optional[float] = 3600.0,
+        chunk_size: int = 10_000,
+        max_workers: int = 8,
+        maximum_bytes_billed: Optional[int] = None,
+        **kwargs: dict[str, Any],
+    ) -> None:
+        """
+        Client for the Asteroid Institute's BigQuery mirror of the MPC database.
+
+        Query results can optionally be cached in-process, so that repeated queries
+        for the same designations or submission IDs do not issue a new BigQuery job.
+        Cached results may be up to `cache_ttl` seconds out of date, which matters
+        for submissions whose status is still changing, so the cache is disabled
+        by default.
+
+        Parameters
+        ----------
+        cache_max_bytes : int, optional
+            Maximum total size in bytes of the cached query results. The default of
+            0 disables the cache.
+        cache_ttl : float, optional
+            Number of seconds after which a cached result is discarded. If None,
+            cached results never expire.
+        chunk_size : int, optional
+            Maximum number of designations (or submission IDs) sent in a single query.
+            Longer lists are split into several queries that run in parallel.
+        max_workers : int, optional
+            Maximum number of chunked queries to run at the same time.
+        maximum_bytes_billed : int, optional
+            If set, queries that would bill more than this many bytes fail instead
+            of running.
+        **kwargs
+            Keyword arguments passed to `google.cloud.bigquery.Client`.
+        """
+        self._client_kwargs = kwargs
         self.dataset_id = "moeyens-thor-dev.mpc_sbn_aurora"
+        # Observations query for each combination of the optional filters, keyed by
+        # whether it filters by observation time and by band
+        self._filtered_observations_sql = {
+            (by_time, by_band): _format_sql(
+                _OBSERVATIONS_SQL,
+                self.dataset_id,
+                observation_filter=(_OBSTIME_FILTER if by_time else "")
+                + (_BAND_FILTER if by_band else ""),
+            )
+            for by_time in (False, True)
+            for by_band in (False, True)
+        }
+        self._observations_sql = self._filtered_observations_sql[False, False]
+        self._all_orbits_sql = _format_sql(_ALL_ORBITS_SQL, self.dataset_id)
+        self._orbits_sql = _format_sql(_ORBITS_SQL, self.dataset_id)
+        self._submission_info_sql = _format_sql(_SUBMISSION_INFO_SQL, self.dataset_id)
+        self._submission_history_sql = _format_sql(
+            _SUBMISSION_HISTORY_SQL, self.dataset_id
+        )
+        self._primary_objects_sql = _format_sql(_PRIMARY_OBJECTS_SQL, self.dataset_id)
+        self._credentials = kwargs.get("credentials")
+        self._cache = _QueryCache(cache_max_bytes, cache_ttl)
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.maximum_bytes_billed = maximum_bytes_billed
 
-    def query_observations(self, provids: List[str]) -> MPCObservations:
+    @cached_property
+    def client(self) -> bigquery.Client:
+        """
+        BigQuery client used to run queries. It is created on first use, so that
+        constructing this client does not look up credentials until a query is made,
+        and is shared with other instances created with the same arguments.
+        """
+        try:
+            hash(tuple(self._client_kwargs.items()))
+        except TypeError:
+            # Arguments such as a client_options dict cannot key the shared clients
+            return bigquery.Client(**self._client_kwargs)
+        return _shared_client(**cast(dict[str, Hashable], self._client_kwargs))
+
+    @cached_property
+    def bqstorage_client(self) -> bigquery_storage.BigQueryReadClient:
+        """
+        BigQuery Storage Read API client used to download query results as Arrow
+        record batches. It is created on first use and shared by all queries (and
+        by other instances with the same credentials) so that its gRPC channel is
+        reused rather than opened for every download.
+        """
+        return _shared_bqstorage_client(cast(Hashable, self._credentials))
+
+    def _create_clients(
+        self,
+    ) -> Tuple[bigquery.Client, bigquery_storage.BigQueryReadClient]:
+        """
+        Create the lazily initialized clients, if they do not exist yet, and return
+        them. Call this before starting worker threads so that the workers share
+        one pair of clients rather than racing to create their own.
+        """
+        return self.client, self.bqstorage_client
+
+    def clear_cache(self) -> None:
+        """
+        Discard all cached query results.
+        """
+        self._cache.clear()
+
+    def _run_query(
+        self,
+        query: str,
+        query_parameters: Optional[List[_QueryParameter]] = None,
+        sort_by: Optional[List[Tuple[str, str]]] = None,
+        split_by: Optional[Tuple[str, str]] = None,
+        distinct: bool = False,
+    ) -> pa.Table:
+        """
+        Run a query against BigQuery and return the results as a PyArrow table.
+
+        Values are bound as query parameters rather than interpolated into the SQL so
+        that the query text is identical across calls, which lets BigQuery reuse
+        cached results. Results are also cached in-process, keyed by the query and
+        the set of parameter values.
+
+        Parameters
+        ----------
+        query : str
+            SQL query to run.
+        query_parameters : List[bigquery.ArrayQueryParameter or bigquery.ScalarQueryParameter], optional
+            Parameters referenced by the query (e.g. @provids).
+        sort_by : List[Tuple[str, str]], optional
+            Columns and orders ("ascending" or "descending") to sort the results by.
+            Sorting the downloaded results with Arrow avoids a final ORDER BY, which
+            BigQuery has to run on a single worker. Nulls sort last.
+        split_by : Tuple[str, str], optional
+            Name of an array parameter and the result column that holds the requested
+            value of each row (e.g. ("provids", "requested_provid")). Only set this
+            when the rows returned for each value do not depend on the other values.
+            Lists longer than `chunk_size` are then queried in chunks in parallel,
+            and requests for a subset of a cached list are served by filtering the
+            cached results.
+        distinct : bool, optional
+            Drop duplicate rows from the downloaded results. This is much cheaper
+            than a SELECT DISTINCT, which BigQuery runs as a hash aggregation over
+            every column of the query's output.
+
+        Returns
+        -------
+        table : pa.Table
+            The query results.
+        """
+        # Duplicate values only enlarge the request and the rows the query has to
+        # de-duplicate, so drop them while keeping the order of first appearance
+        query_parameters = [
+            (
+                bigquery.ArrayQueryParameter(
+                    p.name, p.array_type, list(dict.fromkeys(p.values))
+                )
+                if isinstance(p, bigquery.ArrayQueryParameter)
+                else p
+            )
+            for p in query_parameters or []
+        ]
+
+        # Results are ordered and de-duplicated by the query itself, so the order
+        # of the requested values does not change them
+        key = (
+            query,
+            tuple(
+                (
+                    (p.name, p.array_type, tuple(sorted(p.values)))
+                    if isinstance(p, bigquery.ArrayQueryParameter)
+                    else (p.name, p.type_, (p.value,))
+                )
+                for p in query_parameters
+            ),
+        )
+        table = self._cache.get(key)
+        if table is not None:
+            return table
+
+        if split_by is not None:
+            table = self._filter_cached(key, *split_by)
+            if table is not None:
+                return table
+
+        chunks = self._chunk_parameters(
+            query_parameters, split_by[0] if split_by is not None else None
+        )
+        if len(chunks) == 1:
+            table = self._download(query, chunks[0])
+        else:
+            self._create_clients()
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                tables = list(
+                    executor.map(lambda chunk: self._download(query, chunk), chunks)
+                )
+            table = pa.concat_tables(tables)
+
+        if distinct:
+            # Group on every column without aggregating to keep one row of each
+            # set of duplicates (in order of first appearance)
+            table = table.group_by(table.column_names, use_threads=False).aggregate([])
+
+        if sort_by is not None:
+            table = table.sort_by(sort_by)
+
+        # Results arrive as many record batches; make each column contiguous once
+        # so later conversions (and every cache hit) work on single arrays
+        table = table.combine_chunks()
+        self._cache.put(key, table)
+        return table
+
+    def _filter_cached(
+        self, key: Hashable, parameter: str, column: str
+    ) -> Optional[pa.Table]:
+        """
+        Find cached results for the same query whose values for the given array
+        parameter include all of the requested ones, and select the rows for the
+        requested values.
+        """
+        query, parameters = cast(_CacheKey, key)
+        requested = {
+            name: (array_type, values) for name, array_type, values in parameters
+        }
+        if parameter not in requested:
+            return None
+        array_type, values = requested[parameter]
+
+        for cached_key, cached_table in reversed(self._cache.items()):
+            cached_query, cached_parameters = cast(_CacheKey, cached_key)
+            cached = {name: (t, v) for name, t, v in cached_parameters}
+            if cached_query != query or cached.keys() != requested.keys():
+                continue
+
+            others_match = all(
+                cached[name] == requested[name]
+                for name in requested
+                if name != parameter
+            )
+            cached_array_type, cached_values = cached[parameter]
+            if (
+                others_match
+                and array_type == cached_array_type
+                and set(values).issubset(cached_values)
+            ):
+                mask = pc.is_in(cached_table[column], value_set=pa.array(values))
+                return cached_table.filter(mask)
+
+        return None
+
+    def _chunk_parameters(
+        self,
+        query_parameters: List[_QueryParameter],
+        chunk_parameter: Optional[str],
+    ) -> List[List[_QueryParameter]]:
+        """
+        Split the values of the named array parameter into lists of at most
+        `chunk_size` values, returning the query parameters for each chunk.
+        """
+        for i, parameter in enumerate(query_parameters):
+            if parameter.name != chunk_parameter or not isinstance(
+                parameter, bigquery.ArrayQueryParameter
+            ):
+                continue
+            if len(parameter.values) <= self.chunk_size:
+                break
+
+            return [
+                query_parameters[:i]
+                + [
+                    bigquery.ArrayQueryParameter(
+                        parameter.name,
+                        parameter.array_type,
+                        parameter.values[start : start + self.chunk_size],
+                    )
+                ]
+                + query_parameters[i + 1 :]
+                for start in range(0, len(parameter.values), self.chunk_size)
+            ]
+
+        return [query_parameters]
+
+    def _execute(
+        self, query: str, query_parameters: List[_QueryParameter]
+    ) -> bigquery.table.RowIterator:
+        """
+        Run a single query job and wait for it to finish.
+
+        Jobs run at interactive priority with BigQuery's result cache enabled, and are
+        labelled so that mpcq's usage can be attributed in billing and job listings.
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=query_parameters,
+            use_query_cache=True,
+            priority=bigquery.QueryPriority.INTERACTIVE,
+            labels={"app": "mpcq"},
+        )
+        if self.maximum_bytes_billed is not None:
+            job_config.maximum_bytes_billed = self.maximum_bytes_billed
+        query_job = self.client.query(query, job_config=job_config)
+        return query_job.result()
+
+    def _download(
+        self, query: str, query_parameters: List[_QueryParameter]
+    ) -> pa.Table:
+        """
+        Run a single query job and download its results as a PyArrow table.
+        """
+        results = self._execute(query, query_parameters)
+        return results.to_arrow(
+            progress_bar_type="tqdm", bqstorage_client=self.bqstorage_client
+        )
+
+    def _observations_query(
+        self,
+        obstime_min: Optional[Timestamp],
+        obstime_max: Optional[Timestamp],
+        bands: Optional[List[str]],
+    ) -> Tuple[str, List[_QueryParameter]]:
+        """
+        Select the observations query and the parameters of its optional filters.
+        Without either time bound the query is not restricted by time at all, and
+        without bands it is not restricted by band.
+        """
+        by_time = obstime_min is not None or obstime_max is not None
+        by_band = bands is not None
+        query = self._filtered_observations_sql[by_time, by_band]
+
+        parameters: List[_QueryParameter] = []
+        if bands is not None:
+            parameters.append(
+                bigquery.ArrayQueryParameter("bands", "STRING", sorted(set(bands)))
+            )
+        if not by_time:
+            return query, parameters
+
+        return query, parameters + [
+            bigquery.ScalarQueryParameter(
+                "obstime_min",
+                "TIMESTAMP",
+                (
+                    _to_datetime(obstime_min)
+                    if obstime_min is not None
+                    else datetime(1, 1, 1, tzinfo=timezone.utc)
+                ),
+            ),
+            bigquery.ScalarQueryParameter(
+                "obstime_max",
+                "TIMESTAMP",
+                (
+                    _to_datetime(obstime_max)
+                    if obstime_max is not None
+                    else datetime.max.replace(tzinfo=timezone.utc)
+                ),
+            ),
+        ]
+
+    def query_observations(
+        self,
+        provids: List[str],
+        columns: Optional[List[str]] = None,
+        obstime_min: Optional[Timestamp] = None,
+        obstime_max: Optional[Timestamp] = None,
+        bands: Optional[List[str]] = None,
+    ) -> MPCObservations:
         """
         Query the MPC database for the observations and associated data for the given
         provisional designations.
@@ -123,98 +966,130 @@ class BigQueryMPCClient(MPCClient):
         ----------
         provids : List[str]
             List of provisional designations to query.
+        columns : List[str], optional
+            Names of the MPCObservations columns to return. Only these columns are
+            scanned and downloaded, the others are left null. The requested_provid
+            and obstime columns are always returned. If None, all columns are returned.
+        obstime_min : Timestamp, optional
+            Only return observations made at or after this time.
+        obstime_max : Timestamp, optional
+            Only return observations made at or before this time.
+        bands : List[str], optional
+            Only return observations made in these photometric bands (observations
+            without a band are excluded).
 
         Returns
         -------
         observations : MPCObservations
             The observations and associated data for the given provisional designations.
         """
-        provids_str = ", ".join([f'"{id}"' for id in provids])
+        if len(provids) == 0:
+            return MPCObservations.empty()
 
-        query = f"""
-        WITH requested_provids AS (
-            SELECT provid
-            FROM UNNEST(ARRAY[{provids_str}]) AS provid
+        query, filter_parameters = self._observations_query(
+            obstime_min, obstime_max, bands
         )
-        SELECT DISTINCT
-            rp.provid AS requested_provid,
-            CASE 
-                WHEN ni.permid IS NOT NULL THEN ni.permid 
-                ELSE ci.unpacked_primary_provisional_designation
-            END AS primary_designation,
-            obs_sbn.obsid, 
-            obs_sbn.trksub, 
-            obs_sbn.permid, 
-            obs_sbn.provid, 
-            obs_sbn.submission_id, 
-            obs_sbn.obssubid, 
-            obs_sbn.obstime, 
-            obs_sbn.ra, 
-            obs_sbn.dec, 
-            obs_sbn.rmsra, 
-            obs_sbn.rmsdec, 
-            obs_sbn.mag, 
-            obs_sbn.rmsmag, 
-            obs_sbn.band, 
-            obs_sbn.stn, 
-            obs_sbn.updated_at, 
-            obs_sbn.created_at, 
-            obs_sbn.status,
-        FROM requested_provids AS rp
-        LEFT JOIN `{self.dataset_id}.public_current_identifications` AS ci
-            ON ci.unpacked_secondary_provisional_designation = rp.provid
-        LEFT JOIN `{self.dataset_id}.public_current_identifications` AS ci_alt
-            ON ci.unpacked_primary_provisional_designation = ci_alt.unpacked_primary_provisional_designation
-        LEFT JOIN `{self.dataset_id}.public_numbered_identifications` AS ni
-            ON ci.unpacked_primary_provisional_designation = ni.unpacked_primary_provisional_designation
-        LEFT JOIN `{self.dataset_id}.public_obs_sbn` AS obs_sbn
-            ON ci.unpacked_primary_provisional_designation = obs_sbn.provid
-            OR ci_alt.unpacked_secondary_provisional_designation = obs_sbn.provid
-            OR ni.permid = obs_sbn.permid
-        ORDER BY requested_provid ASC, obs_sbn.obstime ASC;
-        """
-        query_job = self.client.query(query)
-        results = query_job.result()
-        table = results.to_arrow(progress_bar_type="tqdm", create_bqstorage_client=True)
-
-        obstime = Time(
-            table["obstime"].to_numpy(zero_copy_only=False),
-            format="datetime64",
-            scale="utc",
+        if columns is not None:
+            query = _select_columns(
+                query, MPCObservations, columns, ["requested_provid", "obstime"]
+            )
+
+        table = self._run_query(
+            query,
+            [
+                bigquery.ArrayQueryParameter("provids", "STRING", provids),
+                *filter_parameters,
+            ],
+            sort_by=[("requested_provid", "ascending"), ("obstime", "ascending")],
+            split_by=("provids", "requested_provid"),
         )
-        created_at = Time(
-            table["created_at"].to_numpy(zero_copy_only=False),
-            format="datetime64",
-            scale="utc",
+
+        return _from_arrow(MPCObservations, table)
+
+    def iter_observations(
+        self,
+        provids: List[str],
+        obstime_min: Optional[Timestamp] = None,
+        obstime_max: Optional[Timestamp] = None,
+        bands: Optional[List[str]] = None,
+    ) -> Iterator[MPCObservations]:
+        """
+        Query the MPC database for the observations and associated data for the given
+        provisional designations, yielding them one downloaded batch at a time.
+
+        Unlike `query_observations`, the full result set is never held in memory, so
+        this is suited to designations with very many observations. The batches are
+        neither sorted nor cached.
+
+        Parameters
+        ----------
+        provids : List[str]
+            List of provisional designations to query.
+        obstime_min : Timestamp, optional
+            Only return observations made at or after this time.
+        obstime_max : Timestamp, optional
+            Only return observations made at or before this time.
+        bands : List[str], optional
+            Only return observations made in these photometric bands (observations
+            without a band are excluded).
+
+        Yields
+        ------
+        observations : MPCObservations
+            The observations and associated data for the next batch of results.
+        """
+        if len(provids) == 0:
+            return
+
+        query, filter_parameters = self._observations_query(
+            obstime_min, obstime_max, bands
         )
-        updated_at = Time(
-            table["updated_at"].to_numpy(zero_copy_only=False),
-            format="datetime64",
-            scale="utc",
+        results = self._execute(
+            query,
+            [
+                bigquery.ArrayQueryParameter(
+                    "provids", "STRING", list(dict.fromkeys(provids))
+                ),
+                *filter_parameters,
+            ],
         )
+        for batch in results.to_arrow_iterable(bqstorage_client=self.bqstorage_client):
+            yield _from_arrow(MPCObservations, pa.Table.from_batches([batch]))
+
+    def iter_orbits(self, provids: List[str]) -> Iterator[MPCOrbits]:
+        """
+        Query the MPC database for the orbits and associated data for the given
+        provisional designations, yielding them one downloaded batch at a time.
+
+        Unlike `query_orbits`, the full result set is never held in memory, so this
+        is suited to very long lists of designations. The batches are neither sorted
+        nor cached.
 
-        return MPCObservations.from_kwargs(
-            requested_provid=table["requested_provid"],
-            obsid=table["obsid"],
-            primary_designation=table["primary_designation"],
-            trksub=table["trksub"],
-            provid=table["provid"],
-            permid=table["permid"],
-            submission_id=table["submission_id"],
-            obssubid=table["obssubid"],
-            obstime=Timestamp.from_astropy(obstime),
-            ra=table["ra"],
-            dec=table["dec"],
-            rmsra=table["rmsra"],
-            rmsdec=table["rmsdec"],
-            mag=table["mag"],
-            rmsmag=table["rmsmag"],
-            band=table["band"],
-            stn=table["stn"],
-            updated_at=Timestamp.from_astropy(updated_at),
-            created_at=Timestamp.from_astropy(created_at),
-            status=table["status"],
+        Parameters
+        ----------
+        provids : List[str]
+            List of provisional designations to query.
+
+        Yields
+        ------
+        orbits : MPCOrbits
+            The orbits and associated data for the next batch of results.
+        """
+        if len(provids) == 0:
+            return
+
+        results = self._execute(
+            self._orbits_sql,
+            [
+                bigquery.ArrayQueryParameter(
+                    "provids", "STRING", list(dict.fromkeys(provids))
+                )
+            ],
         )
+        for batch in results.to_arrow_iterable(bqstorage_client=self.bqstorage_client):
+            table = pa.Table.from_batches([batch])
+            epoch = Timestamp.from_mjd(table["epoch_mjd"], scale="tt")
+            yield _from_arrow(MPCOrbits, table, epoch=epoch)
 
     def all_orbits(self) -> MPCOrbits:
         """
@@ -225,83 +1100,25 @@ class BigQueryMPCClient(MPCClient):
         orbits : MPCOrbits
             The orbits and associated data for all objects in the MPC database.
         """
-        query = f"""
-        SELECT
-            mpc_orbits.id, 
-            mpc_orbits.unpacked_primary_provisional_designation AS provid, 
-            mpc_orbits.epoch_mjd,
-            mpc_orbits.q, 
-            mpc_orbits.e,
-            mpc_orbits.i, 
-            mpc_orbits.node,
-            mpc_orbits.argperi,
-            mpc_orbits.peri_time,
-            mpc_orbits.q_unc,
-            mpc_orbits.e_unc,
-            mpc_orbits.i_unc,
-            mpc_orbits.node_unc,
-            mpc_orbits.argperi_unc,
-            mpc_orbits.peri_time_unc,
-            mpc_orbits.a1,
-            mpc_orbits.a2,
-            mpc_orbits.a3,
-            mpc_orbits.h,
-            mpc_orbits.g,
-            mpc_orbits.created_at,
-            mpc_orbits.updated_at
-        FROM `{self.dataset_id}.public_mpc_orbits` AS mpc_orbits
-        ORDER BY mpc_orbits.epoch_mjd ASC;
-        """
-        query_job = self.client.query(query)
-        results = query_job.result()
-
-        table = results.to_arrow(progress_bar_type="tqdm", create_bqstorage_client=True)
-
-        created_at = Time(
-            table["created_at"].to_numpy(zero_copy_only=False),
-            format="datetime64",
-            scale="utc",
-        )
-        updated_at = Time(
-            table["updated_at"].to_numpy(zero_copy_only=False),
-            format="datetime64",
-            scale="utc",
+        table = self._run_query(
+            self._all_orbits_sql, sort_by=[("epoch_mjd", "ascending")]
         )
 
-        # Handle NULL values in the epoch_mjd column: ideally
-        # we should have the Timestamp class be able to handle this
-        mjd_array = table["epoch_mjd"].to_numpy(zero_copy_only=False)
-        mjds = np.ma.masked_array(mjd_array, mask=np.isnan(mjd_array))  # type: ignore
-        epoch = Time(mjds, format="mjd", scale="tt")
+        # Build the epochs directly from the MJD floats in one vectorized
+        # call: NULL values in the epoch_mjd column propagate as nulls
+        epoch = Timestamp.from_mjd(table["epoch_mjd"], scale="tt")
 
-        return MPCOrbits.from_kwargs(
+        return _from_arrow(
+            MPCOrbits,
+            table,
             # Note, since we didn't request a specific provid we use the one MPC provides
             requested_provid=table["provid"],
-            id=table["id"],
-            provid=table["provid"],
-            epoch=Timestamp.from_astropy(epoch),
-            q=table["q"],
-            e=table["e"],
-            i=table["i"],
-            node=table["node"],
-            argperi=table["argperi"],
-            peri_time=table["peri_time"],
-            q_unc=table["q_unc"],
-            e_unc=table["e_unc"],
-            i_unc=table["i_unc"],
-            node_unc=table["node_unc"],
-            argperi_unc=table["argperi_unc"],
-            peri_time_unc=table["peri_time_unc"],
-            a1=table["a1"],
-            a2=table["a2"],
-            a3=table["a3"],
-            h=table["h"],
-            g=table["g"],
-            created_at=Timestamp.from_astropy(created_at),
-            updated_at=Timestamp.from_astropy(updated_at),
+            epoch=epoch,
         )
 
-    def query_orbits(self, provids: List[str]) -> MPCOrbits:
+    def query_orbits(
+        self, provids: List[str], columns: Optional[List[str]] = None
+    ) -> MPCOrbits:
         """
         Query the MPC database for the orbits and associated data for the given
         provisional designations.
@@ -310,108 +1127,42 @@ class BigQueryMPCClient(MPCClient):
         ----------
         provids : List[str]
             List of provisional designations to query.
+        columns : List[str], optional
+            Names of the MPCOrbits columns to return. Only these columns are scanned
+            and downloaded, the others are left null. The requested_provid and epoch
+            columns are always returned. If None, all columns are returned.
 
         Returns
         -------
         orbits : MPCOrbits
             The orbits and associated data for the given provisional designations.
         """
-        provids_str = ", ".join([f'"{id}"' for id in provids])
+        if len(provids) == 0:
+            return MPCOrbits.empty()
 
-        query = f"""
-        WITH requested_provids AS (
-            SELECT provid
-            FROM UNNEST(ARRAY[{provids_str}]) AS provid
-        )
-        SELECT DISTINCT 
-            rp.provid AS requested_provid,
-            CASE
-                WHEN ni.permid IS NOT NULL THEN ni.permid
-                ELSE ci.unpacked_primary_provisional_designation
-            END AS primary_designation,
-            mpc_orbits.id, 
-            mpc_orbits.unpacked_primary_provisional_designation AS provid, 
-            mpc_orbits.epoch_mjd,
-            mpc_orbits.q, 
-            mpc_orbits.e,
-            mpc_orbits.i, 
-            mpc_orbits.node,
-            mpc_orbits.argperi,
-            mpc_orbits.peri_time,
-            mpc_orbits.q_unc,
-            mpc_orbits.e_unc,
-            mpc_orbits.i_unc,
-            mpc_orbits.node_unc,
-            mpc_orbits.argperi_unc,
-            mpc_orbits.peri_time_unc,
-            mpc_orbits.a1,
-            mpc_orbits.a2,
-            mpc_orbits.a3,
-            mpc_orbits.h,
-            mpc_orbits.g,
-            mpc_orbits.created_at,
-            mpc_orbits.updated_at
-        FROM requested_provids AS rp
-        LEFT JOIN `{self.dataset_id}.public_current_identifications` AS ci
-            ON ci.unpacked_secondary_provisional_designation = rp.provid
-        LEFT JOIN `{self.dataset_id}.public_current_identifications` AS ci_alt
-            ON ci.unpacked_primary_provisional_designation = ci_alt.unpacked_primary_provisional_designation
-        LEFT JOIN `{self.dataset_id}.public_numbered_identifications` AS ni
-            ON ci.unpacked_primary_provisional_designation = ni.unpacked_primary_provisional_designation
-        LEFT JOIN `{self.dataset_id}.public_mpc_orbits` AS mpc_orbits
-            ON ci.unpacked_primary_provisional_designation = mpc_orbits.unpacked_primary_provisional_designation
-        ORDER BY 
-            requested_provid ASC,
-            mpc_orbits.epoch_mjd ASC;
-        """
-        query_job = self.client.query(query)
-        results = query_job.result()
-        table = results.to_arrow(progress_bar_type="tqdm", create_bqstorage_client=True)
-
-        created_at = Time(
-            table["created_at"].to_numpy(zero_copy_only=False),
-            format="datetime64",
-            scale="utc",
-        )
-        updated_at = Time(
-            table["updated_at"].to_numpy(zero_copy_only=False),
-            format="datetime64",
-            scale="utc",
-        )
+        query = self._orbits_sql
+        if columns is not None:
+            query = _select_columns(
+                query,
+                MPCOrbits,
+                columns,
+                ["requested_provid", "epoch_mjd"],
+                renamed={"epoch": "epoch_mjd"},
+            )
 
-        # Handle NULL values in the epoch_mjd column: ideally
-        # we should have the Timestamp class be able to handle this
-        mjd_array = table["epoch_mjd"].to_numpy(zero_copy_only=False)
-        mjds = np.ma.masked_array(mjd_array, mask=np.isnan(mjd_array))  # type: ignore
-        epoch = Time(mjds, format="mjd", scale="tt")
-
-        return MPCOrbits.from_kwargs(
-            requested_provid=table["requested_provid"],
-            primary_designation=table["primary_designation"],
-            id=table["id"],
-            provid=table["provid"],
-            epoch=Timestamp.from_astropy(epoch),
-            q=table["q"],
-            e=table["e"],
-            i=table["i"],
-            node=table["node"],
-            argperi=table["argperi"],
-            peri_time=table["peri_time"],
-            q_unc=table["q_unc"],
-            e_unc=table["e_unc"],
-            i_unc=table["i_unc"],
-            node_unc=table["node_unc"],
-            argperi_unc=table["argperi_unc"],
-            peri_time_unc=table["peri_time_unc"],
-            a1=table["a1"],
-            a2=table["a2"],
-            a3=table["a3"],
-            h=table["h"],
-            g=table["g"],
-            created_at=Timestamp.from_astropy(created_at),
-            updated_at=Timestamp.from_astropy(updated_at),
+        table = self._run_query(
+            query,
+            [bigquery.ArrayQueryParameter("provids", "STRING", provids)],
+            sort_by=[("requested_provid", "ascending"), ("epoch_mjd", "ascending")],
+            split_by=("provids", "requested_provid"),
         )
 
+        # Build the epochs directly from the MJD floats in one vectorized
+        # call: NULL values in the epoch_mjd column propagate as nulls
+        epoch = Timestamp.from_mjd(table["epoch_mjd"], scale="tt")
+
+        return _from_arrow(MPCOrbits, table, epoch=epoch)
+
     def query_submission_info(self, submission_ids: List[str]) -> MPCSubmissionResults:
         """
         Query for observation status and mapping (observation ID to trksub, provid, etc.) for a
@@ -427,40 +1178,22 @@ class BigQueryMPCClient(MPCClient):
         submission_info : MPCSubmissionResults
             The observation status and mapping for the given submission IDs.
         """
-        submission_ids_str = ", ".join([f'"{id}"' for id in submission_ids])
-        query = f"""
-        WITH requested_submission_ids AS (
-            SELECT submission_id
-            FROM UNNEST(ARRAY[{submission_ids_str}]) AS submission_id
+        if len(submission_ids) == 0:
+            return MPCSubmissionResults.empty()
+
+        table = self._run_query(
+            self._submission_info_sql,
+            [bigquery.ArrayQueryParameter("submission_ids", "STRING", submission_ids)],
+            sort_by=[
+                ("requested_submission_id", "ascending"),
+                ("obsid", "ascending"),
+            ],
+            split_by=("submission_ids", "requested_submission_id"),
+            # The identification joins can match the same observation more than once
+            distinct=True,
         )
-        SELECT DISTINCT
-            sb.submission_id AS requested_submission_id,
-            obs_sbn.obsid,
-            obs_sbn.obssubid, 
-            obs_sbn.trksub, 
-            CASE 
-                WHEN ni.permid IS NOT NULL THEN ni.permid 
-                ELSE ci.unpacked_primary_provisional_designation
-            END AS primary_designation,
-            obs_sbn.permid, 
-            obs_sbn.provid, 
-            obs_sbn.submission_id, 
-            obs_sbn.status
-        FROM requested_submission_ids AS sb
-        LEFT JOIN `{self.dataset_id}.public_obs_sbn` AS obs_sbn
-            ON sb.submission_id = obs_sbn.submission_id
-        LEFT JOIN `{self.dataset_id}.public_current_identifications` AS ci
-            ON ci.unpacked_secondary_provisional_designation = obs_sbn.provid
-            OR ci.unpacked_primary_provisional_designation = obs_sbn.provid
-        LEFT JOIN `{self.dataset_id}.public_numbered_identifications` AS ni
-            ON obs_sbn.permid = ni.permid
-        ORDER BY requested_submission_id ASC, obs_sbn.obsid ASC;
-        """
-        query_job = self.client.query(query)
-        results = query_job.result()
-        table = results.to_arrow(progress_bar_type="tqdm", create_bqstorage_client=True)
-
-        return MPCSubmissionResults.from_pyarrow(table)
+
+        return _from_arrow(MPCSubmissionResults, table)
 
     def query_submission_history(self, provids: List[str]) -> MPCSubmissionHistory:
         """
@@ -476,96 +1209,39 @@ class BigQueryMPCClient(MPCClient):
         submission_history : MPCSubmissionHistory
             The submission history for the given provisional designations.
         """
-        provids_str = ", ".join([f'"{id}"' for id in provids])
-        query = f"""
-        WITH requested_provids AS (
-            SELECT provid
-            FROM UNNEST(ARRAY[{provids_str}]) AS provid
-        )
-        SELECT DISTINCT
-            rp.provid AS requested_provid,
-            CASE 
-                WHEN ni.permid IS NOT NULL THEN ni.permid 
-                ELSE ci.unpacked_primary_provisional_designation
-            END AS primary_designation,
-            obs_sbn.obsid, 
-            obs_sbn.obstime,
-            obs_sbn.submission_id
-        FROM requested_provids AS rp 
-        LEFT JOIN `{self.dataset_id}.public_current_identifications` AS ci
-            ON ci.unpacked_secondary_provisional_designation = rp.provid
-        LEFT JOIN `{self.dataset_id}.public_current_identifications` AS ci_alt
-            ON ci.unpacked_primary_provisional_designation = ci_alt.unpacked_primary_provisional_designation
-        LEFT JOIN `{self.dataset_id}.public_numbered_identifications` AS ni
-            ON ci.unpacked_primary_provisional_designation = ni.unpacked_primary_provisional_designation
-        LEFT JOIN `{self.dataset_id}.public_obs_sbn` AS obs_sbn
-            ON ci.unpacked_primary_provisional_designation = obs_sbn.provid
-            OR ci_alt.unpacked_secondary_provisional_designation = obs_sbn.provid
-            OR ni.permid = obs_sbn.permid
-        ORDER BY requested_provid ASC, obs_sbn.obstime ASC;
-        """
-        query_job = self.client.query(query)
-        results = query_job.result()
-
-        # Convert the results to a PyArrow table
-        table = results.to_arrow(progress_bar_type="tqdm", create_bqstorage_client=True)
-        table = (
-            table.group_by(["requested_provid", "primary_designation", "submission_id"])
-            .aggregate(
-                [("obsid", "count_distinct"), ("obstime", "min"), ("obstime", "max")]
-            )
-            .sort_by(
-                [("primary_designation", "ascending"), ("submission_id", "ascending")]
-            )
-            .rename_columns(
-                [
-                    "requested_provid",
-                    "primary_designation",
-                    "submission_id",
-                    "num_obs",
-                    "first_obs_time",
-                    "last_obs_time",
-                ]
-            )
+        if len(provids) == 0:
+            return MPCSubmissionHistory.empty()
+
+        table = self._run_query(
+            self._submission_history_sql,
+            [bigquery.ArrayQueryParameter("provids", "STRING", provids)],
+            sort_by=[
+                ("primary_designation", "ascending"),
+                ("submission_id", "ascending"),
+            ],
         )
 
-        # Create array that tracks the index of each row
-        table = table.append_column("idx", pa.array(np.arange(len(table))))
-
-        # Find the first and last index of each group (first and last submission)
-        # and append boolean columns to the table
-        first_last_idx = table.group_by(
-            ["primary_designation"], use_threads=False
-        ).aggregate([("idx", "first"), ("idx", "last")])
-        first = np.zeros(len(table), dtype=bool)
-        last = np.zeros(len(table), dtype=bool)
-        first[first_last_idx["idx_first"].to_numpy(zero_copy_only=False)] = True
-        last[first_last_idx["idx_last"].to_numpy(zero_copy_only=False)] = True
-        table = table.append_column("first_submission", pa.array(first))
-        table = table.append_column("last_submission", pa.array(last))
-
-        # Calculate the arc length of each submission
-        start_times = Time(
-            table["first_obs_time"].to_numpy(zero_copy_only=False), scale="utc"
+        last_obs_time = timestamp_from_arrow(table["last_obs_time"])
+
+        # Calculate the arc length of each submission in days. Arrow timestamps are
+        # POSIX times, so leap seconds are not counted as elapsed time: an arc from
+        # 2016-12-31T12:00 to 2017-01-01T12:00 is exactly 1.0 day, the same as the
+        # difference of the two UTC MJDs
+        arc_duration = pc.cast(
+            pc.subtract(table["last_obs_time"], table["first_obs_time"]),
+            pa.duration("us"),
         )
-        end_times = Time(
-            table["last_obs_time"].to_numpy(zero_copy_only=False), scale="utc"
+        arc_length = pc.divide(
+            pc.cast(pc.cast(arc_duration, pa.int64()), pa.float64()), 86_400e6
         )
-        arc_length = end_times.utc.mjd - start_times.utc.mjd
 
-        return MPCSubmissionHistory.from_kwargs(
-            requested_provid=table["requested_provid"],
-            primary_designation=table["primary_designation"],
-            submission_id=table["submission_id"],
+        return _from_arrow(
+            MPCSubmissionHistory,
+            table,
             submission_time=infer_submission_time(
-                table["submission_id"].to_numpy(zero_copy_only=False),
-                end_times.utc.isot,
+                table["submission_id"], last_obs_time
             ),
-            first_submission=table["first_submission"],
-            last_submission=table["last_submission"],
-            num_obs=table["num_obs"],
-            first_obs_time=Timestamp.from_astropy(start_times),
-            last_obs_time=Timestamp.from_astropy(end_times),
+            last_obs_time=last_obs_time,
             arc_length=arc_length,
         )
 
@@ -584,51 +1260,58 @@ class BigQueryMPCClient(MPCClient):
         primary_objects : MPCPrimaryObjects
             The primary objects and associated data for the given provisional designations.
         """
-        provids_str = ", ".join([f'"{id}"' for id in provids])
+        if len(provids) == 0:
+            return MPCPrimaryObjects.empty()
 
-        query = f"""WITH requested_provids AS (
-            SELECT provid
-            FROM UNNEST(ARRAY[{provids_str}]) AS provid
-        )
-        SELECT DISTINCT
-            rp.provid AS requested_provid,
-            CASE 
-                WHEN ni.permid IS NOT NULL THEN ni.permid 
-                ELSE ci.unpacked_primary_provisional_designation
-            END AS primary_designation,
-            po.unpacked_primary_provisional_designation as provid, 
-            po.created_at, 
-            po.updated_at
-        FROM requested_provids AS rp
-        LEFT JOIN `{self.dataset_id}.public_current_identifications` AS ci
-            ON ci.unpacked_secondary_provisional_designation = rp.provid
-        LEFT JOIN `{self.dataset_id}.public_current_identifications` AS ci_alt
-            ON ci.unpacked_primary_provisional_designation = ci_alt.unpacked_primary_provisional_designation
-        LEFT JOIN `{self.dataset_id}.public_numbered_identifications` AS ni
-            ON ci.unpacked_primary_provisional_designation = ni.unpacked_primary_provisional_designation
-        LEFT JOIN `{self.dataset_id}.public_primary_objects` AS po
-            ON ci.unpacked_primary_provisional_designation = po.unpacked_primary_provisional_designation
-        ORDER BY requested_provid ASC;
-        """
-        query_job = self.client.query(query)
-        results = query_job.result()
-        table = results.to_arrow(progress_bar_type="tqdm", create_bqstorage_client=True)
-
-        created_at = Time(
-            table["created_at"].to_numpy(zero_copy_only=False),
-            format="datetime64",
-            scale="utc",
-        )
-        updated_at = Time(
-            table["updated_at"].to_numpy(zero_copy_only=False),
-            format="datetime64",
-            scale="utc",
+        table = self._run_query(
+            self._primary_objects_sql,
+            [bigquery.ArrayQueryParameter("provids", "STRING", provids)],
+            sort_by=[("requested_provid", "ascending")],
+            split_by=("provids", "requested_provid"),
         )
 
-        return MPCPrimaryObjects.from_kwargs(
-            requested_provid=table["requested_provid"],
-            primary_designation=table["primary_designation"],
-            provid=table["provid"],
-            created_at=Timestamp.from_astropy(created_at),
-            updated_at=Timestamp.from_astropy(updated_at),
-        )
+        return _from_arrow(MPCPrimaryObjects, table)
+
+    def query_all(
+        self, provids: List[str], max_workers: int = 4
+    ) -> Tuple[MPCObservations, MPCOrbits, MPCSubmissionHistory, MPCPrimaryObjects]:
+        """
+        Query the observations, orbits, submission history and primary objects for the
+        given provisional designations concurrently.
+
+        Each query is run in its own thread so that the BigQuery jobs execute and their
+        results download in parallel, rather than waiting for each job in turn. The
+        BigQuery clients are thread-safe and are shared by all of the queries.
+
+        Parameters
+        ----------
+        provids : List[str]
+            List of provisional designations to query.
+        max_workers : int, optional
+            Maximum number of queries to run at the same time.
+
+        Returns
+        -------
+        observations : MPCObservations
+            The observations and associated data for the given provisional designations.
+        orbits : MPCOrbits
+            The orbits and associated data for the given provisional designations.
+        submission_history : MPCSubmissionHistory
+            The submission history for the given provisional designations.
+        primary_objects : MPCPrimaryObjects
+            The primary objects and associated data for the given provisional designations.
+        """
+        self._create_clients()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            observations = executor.submit(self.query_observations, provids)
+            orbits = executor.submit(self.query_orbits, provids)
+            submission_history = executor.submit(self.query_submission_history, provids)
+            primary_objects = executor.submit(self.query_primary_objects, provids)
+
+            return (
+                observations.result(),
+                orbits.result(),
+                submission_history.result(),
+                primary_objects.result(),
+            )
@@ -41,20 +41,14 @@ class MPCOrbits(qv.Table):
         orbits : Orbits
             The orbits and associated data for the given provisional designations.
         """
-        covariances = CoordinateCovariances.from_sigmas(
-            np.array(
-                self.table.select(
-                    [
-                        "q_unc",
-                        "e_unc",
-                        "i_unc",
-                        "node_unc",
-                        "argperi_unc",
-                        "peri_time_unc",
-                    ]
-                )
-            )
-        )
+        # Fill the sigmas directly into a single preallocated array rather
+        # than stacking a list of per-column arrays
+        sigmas = np.empty((len(self), 6), dtype=np.float64)
+        for j, column in enumerate(
+            ["q_unc", "e_unc", "i_unc", "node_unc", "argperi_unc", "peri_time_unc"]
+        ):
+            sigmas[:, j] = self.table[column].to_numpy(zero_copy_only=False)
+        covariances = CoordinateCovariances.from_sigmas(sigmas)
 
         orbits = Orbits.from_kwargs(
             orbit_id=self.id,
@@ -1,10 +1,13 @@
 import warnings
-from typing import List
+from typing import List, Union
 
+import numpy as np
+import pyarrow as pa
 import pyarrow.compute as pc
 import quivr as qv
 from adam_core.time import Timestamp
-from astropy.time import Time
+
+from .utils import timestamp_from_arrow
 
 
 class SubmissionDetails(qv.Table):
@@ -43,17 +46,20 @@ class TrksubMapping(qv.Table):
         """
         assert pc.all(pc.is_in(results.trksub, details.trksub)).as_py()
 
-        unique_submission_details = details.drop_duplicates(
-            ["orbit_id", "trksub", "submission_id"]
-        )
+        # Grouping without aggregations gives the distinct rows with a single hash
+        # pass and keeps only the grouped columns, which are all the join needs
+        unique_submission_details = details.table.group_by(
+            ["orbit_id", "trksub", "submission_id"], use_threads=False
+        ).aggregate([])
 
-        unique_mappings = results.drop_duplicates(
-            ["trksub", "primary_designation", "permid", "provid", "submission_id"]
-        )
+        unique_mappings = results.table.group_by(
+            ["trksub", "primary_designation", "permid", "provid", "submission_id"],
+            use_threads=False,
+        ).aggregate([])
 
         trksub_mapping = (
-            unique_submission_details.table.join(
-                unique_mappings.table,
+            unique_submission_details.join(
+                unique_mappings,
                 ("trksub", "submission_id"),
                 ("trksub", "submission_id"),
             )
@@ -104,7 +110,8 @@ class MPCSubmissionHistory(qv.Table):
 
 
 def infer_submission_time(
-    submission_ids: List[str], last_observation_times: Timestamp
+    submission_ids: Union[List[str], pa.Array, pa.ChunkedArray],
+    last_observation_times: Timestamp,
 ) -> Timestamp:
     """
     Infer the submission time from the submission ID and last observation time for
@@ -116,7 +123,7 @@ def infer_submission_time(
 
     Parameters
     ----------
-    submission_ids : list of str
+    submission_ids : list of str or pa.Array
         List of submission IDs.
     last_observation_times : Timestamp
         Last observation time for each submission.
@@ -126,18 +133,31 @@ def infer_submission_time(
     Timestamp
         Submission time for each submission.
     """
-    times_isot = []
-    for i, (submission_id, last_observation_time) in enumerate(
-        zip(submission_ids, last_observation_times)
-    ):
-        if submission_id == "00000000":
-            submission_time = last_observation_time
-            warnings.warn(
-                f"Submission ID is 00000000 for observation at index {i}. Using observation time as submission time."
-            )
-        else:
-            submission_time = submission_id.split("_")[0]
+    if not isinstance(submission_ids, (pa.Array, pa.ChunkedArray)):
+        submission_ids = pa.array(submission_ids, type=pa.large_string())
 
-        times_isot.append(submission_time)
+    is_historical = pc.fill_null(pc.equal(submission_ids, "00000000"), False)
+    for i in np.flatnonzero(is_historical.to_numpy(zero_copy_only=False)):
+        warnings.warn(
+            f"Submission ID is 00000000 for observation at index {i}. Using observation time as submission time."
+        )
 
-    return Timestamp.from_astropy(Time(times_isot, format="isot", scale="utc"))
+    # Submission IDs start with the ISO 8601 time of submission, e.g.
+    # "2024-01-01T00:00:00.000_0000AAAA", which Arrow parses directly
+    submission_isot = pc.list_element(
+        pc.split_pattern(submission_ids, "_", max_splits=1), 0
+    )
+    submission_times = timestamp_from_arrow(
+        pc.cast(pc.if_else(is_historical, None, submission_isot), pa.timestamp("us"))
+    )
+
+    last_observation_times = last_observation_times.rescale("utc")
+    return Timestamp.from_kwargs(
+        days=pc.if_else(
+            is_historical, last_observation_times.days, submission_times.days
+        ),
+        nanos=pc.if_else(
+            is_historical, last_observation_times.nanos, submission_times.nanos
+        ),
+        scale="utc",
+    )
@@ -0,0 +1,460 @@
+from datetime import datetime, timezone
+from typing import Any
+
+import pyarrow as pa
+import pytest
+from adam_core.time import Timestamp
+from google.cloud import bigquery
+
+from mpcq.client import (
+    BigQueryMPCClient,
+    _format_sql,
+    _QueryCache,
+    _shared_bqstorage_client,
+    _shared_client,
+)
+from mpcq.submissions import MPCSubmissionResults
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_clients() -> None:
+    _shared_client.cache_clear()
+    _shared_bqstorage_client.cache_clear()
+
+
+@pytest.fixture
+def client(mocker: Any) -> BigQueryMPCClient:
+    mocker.patch("mpcq.client.bigquery.Client")
+    mocker.patch("mpcq.client.bigquery_storage.BigQueryReadClient")
+    return BigQueryMPCClient()
+
+
+@pytest.fixture
+def cached_client(mocker: Any) -> BigQueryMPCClient:
+    mocker.patch("mpcq.client.bigquery.Client")
+    mocker.patch("mpcq.client.bigquery_storage.BigQueryReadClient")
+    return BigQueryMPCClient(cache_max_bytes=1024**2)
+
+
+def mock_results(client: BigQueryMPCClient, table: pa.Table) -> None:
+    query_job = client.client.query.return_value  # type: ignore[attr-defined]
+    query_job.result.return_value.to_arrow.return_value = table
+
+
+def test_query_templates_formatted(client: BigQueryMPCClient) -> None:
+    queries = [
+        client._observations_sql,
+        client._filtered_observations_sql[True, True],
+        client._all_orbits_sql,
+        client._orbits_sql,
+        client._submission_info_sql,
+        client._submission_history_sql,
+        client._primary_objects_sql,
+    ]
+    for query in queries:
+        assert "{" not in query
+        assert f"`{client.dataset_id}.public_" in query
+
+    # Observations are matched with separate equi-joins rather than an OR join
+    assert "UNION ALL" in client._observations_sql
+    assert "\n        OR " not in client._observations_sql
+
+    # Every scan of obs_sbn, including the join back for the full rows, is
+    # restricted to the requested observation time range and bands
+    joins = client._filtered_observations_sql[True, True].split(
+        f"JOIN `{client.dataset_id}.public_obs_sbn` AS obs_sbn"
+    )[1:]
+    assert len(joins) == 4
+    for join in joins:
+        condition = join.split("\n    UNION ALL")[0].split("\n)")[0]
+        assert "obs_sbn.obstime BETWEEN @obstime_min AND @obstime_max" in condition
+        assert "obs_sbn.band IN UNNEST(@bands)" in condition
+
+    assert "WITH requested_identifications AS (" in _format_sql(
+        "WITH {requested_identifications}", "dataset"
+    )
+
+
+def test_query_submission_info_parameterized(client: BigQueryMPCClient) -> None:
+    submission_ids = ["2024-01-01T00:00:00.000_0000AAAA"]
+    mock_results(client, MPCSubmissionResults.empty().table)
+
+    client.query_submission_info(submission_ids)
+
+    args, kwargs = client.client.query.call_args  # type: ignore[attr-defined]
+    query = args[0]
+    job_config = kwargs["job_config"]
+    assert submission_ids[0] not in query
+    assert "UNNEST(@submission_ids)" in query
+    assert job_config.query_parameters == [
+        bigquery.ArrayQueryParameter("submission_ids", "STRING", submission_ids)
+    ]
+    assert job_config.use_query_cache
+    assert job_config.priority == bigquery.QueryPriority.INTERACTIVE
+    assert job_config.labels == {"app": "mpcq"}
+    assert job_config.maximum_bytes_billed is None
+
+
+def test_query_parameters_deduplicated(client: BigQueryMPCClient) -> None:
+    mock_results(client, MPCSubmissionResults.empty().table)
+
+    client.query_submission_info(["b", "a", "b", "a"])
+
+    _, kwargs = client.client.query.call_args  # type: ignore[attr-defined]
+    job_config = kwargs["job_config"]
+    assert job_config.query_parameters == [
+        bigquery.ArrayQueryParameter("submission_ids", "STRING", ["b", "a"])
+    ]
+
+
+def test_query_results_cached(
+    client: BigQueryMPCClient, cached_client: BigQueryMPCClient
+) -> None:
+    # Caching is opt-in
+    mock_results(client, MPCSubmissionResults.empty().table)
+    client.query_submission_info(["a", "b"])
+    client.query_submission_info(["a", "b"])
+    assert client.client.query.call_count == 2  # type: ignore[attr-defined]
+
+    client = cached_client
+    client.client.query.reset_mock()  # type: ignore[attr-defined]
+    mock_results(client, MPCSubmissionResults.empty().table)
+
+    client.query_submission_info(["a", "b"])
+    client.query_submission_info(["b", "a", "a"])
+    assert client.client.query.call_count == 1  # type: ignore[attr-defined]
+
+    client.clear_cache()
+    client.query_submission_info(["a", "b"])
+    assert client.client.query.call_count == 2  # type: ignore[attr-defined]
+
+
+def test_query_subset_served_from_cache(cached_client: BigQueryMPCClient) -> None:
+    client = cached_client
+    mock_results(
+        client,
+        MPCSubmissionResults.from_kwargs(
+            requested_submission_id=["a", "b", "b"],
+            obsid=["obs1", "obs2", "obs3"],
+        ).table,
+    )
+
+    client.query_submission_info(["a", "b"])
+    results = client.query_submission_info(["b"])
+
+    assert client.client.query.call_count == 1  # type: ignore[attr-defined]
+    assert results.obsid.to_pylist() == ["obs2", "obs3"]
+
+
+def test_query_cache_eviction(mocker: Any) -> None:
+    table = pa.table({"x": pa.array([1.0, 2.0, 3.0])})
+    nbytes = table.nbytes
+    cache = _QueryCache(max_bytes=2 * nbytes, ttl=None)
+
+    cache.put("a", table)
+    cache.put("b", table)
+    assert cache.get("a") is table
+
+    # "b" is now the least recently used entry
+    cache.put("c", table)
+    assert cache.get("b") is None
+    assert cache.get("a") is table
+    assert cache.get("c") is table
+
+    mocker.patch("mpcq.client.time.monotonic", side_effect=[0.0, 5.0, 20.0])
+    expiring = _QueryCache(max_bytes=nbytes, ttl=10.0)
+    expiring.put("a", table)
+    assert expiring.get("a") is table
+    assert expiring.get("a") is None
+
+    disabled = _QueryCache(max_bytes=0, ttl=None)
+    disabled.put("a", pa.table({"x": pa.array([], type=pa.float64())}))
+    assert disabled.get("a") is None
+
+
+def test_query_submission_history_aggregated_in_query(
+    client: BigQueryMPCClient,
+) -> None:
+    timestamp = pa.timestamp("us", tz="UTC")
+    mock_results(
+        client,
+        pa.table(
+            {
+                "requested_provid": ["2013 RR165", "2013 RR165"],
+                "primary_designation": ["2013 RR165", "2013 RR165"],
+                "submission_id": [
+                    "2013-09-01T00:00:00.000_0000AAAA",
+                    "2014-09-01T00:00:00.000_0000AAAB",
+                ],
+                "num_obs": [3, 4],
+                "first_obs_time": pa.array(
+                    [datetime(2013, 8, 30), datetime(2014, 8, 30)], type=timestamp
+                ),
+                "last_obs_time": pa.array(
+                    [datetime(2013, 8, 31, 12), datetime(2014, 8, 31)], type=timestamp
+                ),
+                "first_submission": [True, False],
+                "last_submission": [False, True],
+            }
+        ),
+    )
+
+    history = client.query_submission_history(["2013 RR165"])
+
+    query = client.client.query.call_args[0][0]  # type: ignore[attr-defined]
+    assert "COUNT(DISTINCT obsid) AS num_obs" in query
+    assert "GROUP BY requested_provid, primary_designation, submission_id" in query
+    assert "ORDER BY primary_designation" not in query
+    assert history.num_obs.to_pylist() == [3, 4]
+    assert history.first_submission.to_pylist() == [True, False]
+    assert history.last_submission.to_pylist() == [False, True]
+    assert history.arc_length.to_pylist() == pytest.approx([1.5, 1.0])
+
+
+def test_query_all(client: BigQueryMPCClient, mocker: Any) -> None:
+    methods = [
+        "query_observations",
+        "query_orbits",
+        "query_submission_history",
+        "query_primary_objects",
+    ]
+    mocks = [mocker.patch.object(client, method) for method in methods]
+
+    results = client.query_all(["2013 RR165"])
+
+    assert results == tuple(mock.return_value for mock in mocks)
+    for mock in mocks:
+        mock.assert_called_once_with(["2013 RR165"])
+
+
+def test_query_observations_from_arrow(client: BigQueryMPCClient) -> None:
+    timestamp = pa.timestamp("us", tz="UTC")
+    mock_results(
+        client,
+        pa.table(
+            {
+                "requested_provid": ["2013 RR165"],
+                "primary_designation": ["2013 RR165"],
+                "obsid": ["obs1"],
+                "obstime": pa.array([datetime(2024, 3, 1, 12)], type=timestamp),
+                "ra": [10.0],
+                "dec": [-5.0],
+                "created_at": pa.array([datetime(2024, 3, 2)], type=timestamp),
+                "updated_at": pa.array([None], type=timestamp),
+            }
+        ),
+    )
+
+    observations = client.query_observations(["2013 RR165"])
+
+    assert observations.obsid.to_pylist() == ["obs1"]
+    assert observations.ra.to_pylist() == [10.0]
+    assert observations.obstime.scale == "utc"
+    assert observations.obstime.mjd().to_pylist() == [60370.5]
+    assert observations.created_at.days.to_pylist() == [60371]
+    assert observations.updated_at.days.to_pylist() == [None]
+    assert observations.stn.to_pylist() == [None]
+
+
+def test_query_results_sorted_client_side(client: BigQueryMPCClient) -> None:
+    mock_results(
+        client,
+        pa.table(
+            {
+                "requested_provid": ["b", "a", "b"],
+                "obsid": ["obs3", "obs1", None],
+                "obstime": pa.array(
+                    [datetime(2024, 3, 2), datetime(2024, 3, 1), None],
+                    type=pa.timestamp("us", tz="UTC"),
+                ),
+            }
+        ),
+    )
+
+    observations = client.query_observations(["a", "b"])
+
+    query = client.client.query.call_args[0][0]  # type: ignore[attr-defined]
+    assert "ORDER BY" not in query
+    assert observations.obsid.to_pylist() == ["obs1", "obs3", None]
+
+
+def test_query_chunked(mocker: Any) -> None:
+    mocker.patch("mpcq.client.bigquery.Client")
+    mocker.patch("mpcq.client.bigquery_storage.BigQueryReadClient")
+    client = BigQueryMPCClient(chunk_size=2)
+    mock_results(client, MPCSubmissionResults.empty().table)
+
+    client.query_submission_info(["a", "b", "c", "d", "e"])
+
+    calls = client.client.query.call_args_list  # type: ignore[attr-defined]
+    chunks = sorted(
+        call.kwargs["job_config"].query_parameters[0].values for call in calls
+    )
+    assert chunks == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_iter_observations(client: BigQueryMPCClient) -> None:
+    batches = [
+        pa.record_batch({"requested_provid": ["a"], "obsid": ["obs1"]}),
+        pa.record_batch({"requested_provid": ["a", "a"], "obsid": ["obs2", "obs3"]}),
+    ]
+    query_job = client.client.query.return_value  # type: ignore[attr-defined]
+    query_job.result.return_value.to_arrow_iterable.return_value = iter(batches)
+
+    chunks = list(client.iter_observations(["a", "a"]))
+
+    assert [chunk.obsid.to_pylist() for chunk in chunks] == [
+        ["obs1"],
+        ["obs2", "obs3"],
+    ]
+    _, kwargs = client.client.query.call_args  # type: ignore[attr-defined]
+    assert kwargs["job_config"].query_parameters[0].values == ["a"]
+
+
+def test_query_orbits_columns(client: BigQueryMPCClient) -> None:
+    mock_results(
+        client,
+        pa.table(
+            {
+                "requested_provid": ["2013 RR165"],
+                "epoch_mjd": [60000.0],
+                "q": [2.5],
+                "e": [0.1],
+            }
+        ),
+    )
+
+    orbits = client.query_orbits(["2013 RR165"], columns=["q", "e", "epoch"])
+
+    query = client.client.query.call_args[0][0]  # type: ignore[attr-defined]
+    assert query.startswith("SELECT `requested_provid`, `epoch_mjd`, `q`, `e`\n")
+    assert orbits.q.to_pylist() == [2.5]
+    assert orbits.epoch.mjd().to_pylist() == [60000.0]
+    assert orbits.a1.to_pylist() == [None]
+
+    with pytest.raises(ValueError, match="Unknown MPCOrbits columns: epoch_mjd"):
+        client.query_orbits(["2013 RR165"], columns=["epoch_mjd"])
+
+
+def test_query_submission_info_deduplicated(client: BigQueryMPCClient) -> None:
+    mock_results(
+        client,
+        MPCSubmissionResults.from_kwargs(
+            requested_submission_id=["a", "a", "a"],
+            obsid=["obs2", "obs1", "obs2"],
+            primary_designation=["2013 RR165", "2013 RR165", "2013 RR165"],
+        ).table,
+    )
+
+    results = client.query_submission_info(["a"])
+
+    query = client.client.query.call_args[0][0]  # type: ignore[attr-defined]
+    assert "DISTINCT" not in query
+    assert results.obsid.to_pylist() == ["obs1", "obs2"]
+
+
+def test_client_created_lazily(mocker: Any) -> None:
+    bigquery_client = mocker.patch("mpcq.client.bigquery.Client")
+
+    client = BigQueryMPCClient(project="project")  # type: ignore[arg-type]
+    bigquery_client.assert_not_called()
+
+    assert client.client is client.client
+    bigquery_client.assert_called_once_with(project="project")
+
+
+def test_query_observations_obstime_range(client: BigQueryMPCClient) -> None:
+    mock_results(
+        client,
+        pa.table(
+            {
+                "requested_provid": ["2013 RR165"],
+                "obstime": pa.array([None], type=pa.timestamp("us", tz="UTC")),
+            }
+        ),
+    )
+
+    client.query_observations(["2013 RR165"])
+    query = client.client.query.call_args[0][0]  # type: ignore[attr-defined]
+    assert "@obstime_min" not in query
+
+    client.query_observations(
+        ["2013 RR165"], obstime_min=Timestamp.from_mjd([60370.5], scale="utc")
+    )
+
+    args, kwargs = client.client.query.call_args  # type: ignore[attr-defined]
+    assert "BETWEEN @obstime_min AND @obstime_max" in args[0]
+    assert kwargs["job_config"].query_parameters[1:] == [
+        bigquery.ScalarQueryParameter(
+            "obstime_min", "TIMESTAMP", datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+        ),
+        bigquery.ScalarQueryParameter(
+            "obstime_max", "TIMESTAMP", datetime.max.replace(tzinfo=timezone.utc)
+        ),
+    ]
+
+
+def test_clients_shared_between_instances(mocker: Any) -> None:
+    bigquery_client = mocker.patch("mpcq.client.bigquery.Client")
+    mocker.patch("mpcq.client.bigquery_storage.BigQueryReadClient")
+
+    first = BigQueryMPCClient()
+    second = BigQueryMPCClient()
+    assert first.client is second.client
+    assert first.bqstorage_client is second.bqstorage_client
+    assert bigquery_client.call_count == 1
+
+    options = {"api_endpoint": "https://example.com"}
+    unshared = BigQueryMPCClient(client_options=options)
+    assert unshared.client is bigquery_client.return_value
+    assert bigquery_client.call_count == 2
+
+
+def test_empty_requests_skip_query(client: BigQueryMPCClient) -> None:
+    assert len(client.query_observations([])) == 0
+    assert list(client.iter_observations([])) == []
+    assert len(client.query_orbits([])) == 0
+    assert len(client.query_submission_info([])) == 0
+    assert len(client.query_submission_history([])) == 0
+    assert len(client.query_primary_objects([])) == 0
+
+    client.client.query.assert_not_called()  # type: ignore[attr-defined]
+
+
+def test_iter_orbits(client: BigQueryMPCClient) -> None:
+    batches = [
+        pa.record_batch({"requested_provid": ["a"], "id": [1], "epoch_mjd": [60000.0]}),
+        pa.record_batch({"requested_provid": ["b"], "id": [2], "epoch_mjd": [60001.0]}),
+    ]
+    query_job = client.client.query.return_value  # type: ignore[attr-defined]
+    query_job.result.return_value.to_arrow_iterable.return_value = iter(batches)
+
+    chunks = list(client.iter_orbits(["a", "b", "a"]))
+
+    assert [chunk.id.to_pylist() for chunk in chunks] == [[1], [2]]
+    assert chunks[1].epoch.mjd().to_pylist() == [60001.0]
+    assert chunks[1].epoch.scale == "tt"
+    _, kwargs = client.client.query.call_args  # type: ignore[attr-defined]
+    assert kwargs["job_config"].query_parameters[0].values == ["a", "b"]
+    assert list(client.iter_orbits([])) == []
+
+
+def test_query_observations_bands(client: BigQueryMPCClient) -> None:
+    mock_results(
+        client,
+        pa.table(
+            {
+                "requested_provid": ["2013 RR165"],
+                "obstime": pa.array([None], type=pa.timestamp("us", tz="UTC")),
+            }
+        ),
+    )
+
+    client.query_observations(["2013 RR165"], bands=["r", "g", "r"])
+
+    args, kwargs = client.client.query.call_args  # type: ignore[attr-defined]
+    assert "obs_sbn.band IN UNNEST(@bands)" in args[0]
+    assert "@obstime_min" not in args[0]
+    assert kwargs["job_config"].query_parameters[1:] == [
+        bigquery.ArrayQueryParameter("bands", "STRING", ["g", "r"])
+    ]
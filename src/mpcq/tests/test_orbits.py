@@ -0,0 +1,34 @@
+import numpy as np
+from adam_core.time import Timestamp
+
+from mpcq.orbits import MPCOrbits
+
+
+def test_orbits_covariance_from_uncertainties() -> None:
+    orbits = MPCOrbits.from_kwargs(
+        requested_provid=["2013 RR165", "2020 AB1"],
+        id=[1, 2],
+        provid=["2013 RR165", "2020 AB1"],
+        epoch=Timestamp.from_mjd([60000.0, 60001.0], scale="tt"),
+        q=[1.5, 2.0],
+        e=[0.1, 0.2],
+        i=[5.0, 10.0],
+        node=[30.0, 60.0],
+        argperi=[45.0, 90.0],
+        peri_time=[59900.0, 59950.0],
+        q_unc=[1e-3, None],
+        e_unc=[2e-3, 1e-3],
+        i_unc=[3e-3, 1e-3],
+        node_unc=[4e-3, 1e-3],
+        argperi_unc=[5e-3, 1e-3],
+        peri_time_unc=[6e-3, 1e-3],
+    )
+
+    result = orbits.orbits()
+    assert len(result) == 2
+    assert result.orbit_id.to_pylist() == ["1", "2"]
+
+    covariances = result.coordinates.covariance.to_matrix()
+    assert np.all(np.isfinite(covariances[0]))
+    # A missing uncertainty propagates as an undefined covariance
+    assert np.all(np.isnan(covariances[1]))
@@ -0,0 +1,53 @@
+import pytest
+from adam_core.time import Timestamp
+
+from mpcq.submissions import (
+    MPCSubmissionResults,
+    SubmissionDetails,
+    TrksubMapping,
+    infer_submission_time,
+)
+
+
+def test_infer_submission_time() -> None:
+    submission_ids = [
+        "2024-01-01T06:00:00.000_0000AAAA",
+        "00000000",
+        "2016-12-31T23:59:59.500_0000AAAB",
+    ]
+    last_observation_times = Timestamp.from_mjd(
+        [60310.0, 50000.25, 57753.0], scale="utc"
+    )
+
+    with pytest.warns(UserWarning, match="index 1"):
+        submission_times = infer_submission_time(submission_ids, last_observation_times)
+
+    assert submission_times.scale == "utc"
+    assert submission_times.to_astropy().isot.tolist() == [
+        "2024-01-01T06:00:00.000",
+        "1995-10-10T06:00:00.000",
+        "2016-12-31T23:59:59.500",
+    ]
+
+
+def test_trksub_mapping_from_submissions() -> None:
+    details = SubmissionDetails.from_kwargs(
+        orbit_id=["orbit1", "orbit1", "orbit2"],
+        trksub=["trk1", "trk1", "trk2"],
+        obssubid=["obs1", "obs2", "obs3"],
+        submission_id=["sub1", "sub1", "sub1"],
+    )
+    results = MPCSubmissionResults.from_kwargs(
+        requested_submission_id=["sub1", "sub1", "sub1"],
+        obsid=["a", "b", "c"],
+        trksub=["trk2", "trk1", "trk1"],
+        primary_designation=["2013 RR165", None, None],
+        provid=["2013 RR165", None, None],
+        submission_id=["sub1", "sub1", "sub1"],
+    )
+
+    mapping = TrksubMapping.from_submissions(details, results)
+
+    assert mapping.trksub.to_pylist() == ["trk1", "trk2"]
+    assert mapping.orbit_id.to_pylist() == ["orbit1", "orbit2"]
+    assert mapping.primary_designation.to_pylist() == [None, "2013 RR165"]
@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pyarrow as pa
+from adam_core.time import Timestamp
+from astropy.time import Time
+
+from mpcq.utils import timestamp_from_arrow
+
+
+def test_timestamp_from_arrow_matches_astropy() -> None:
+    times = pa.array(
+        [
+            datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            datetime(1995, 7, 4, 0, 0, 0, tzinfo=timezone.utc),
+            # Day ending in a leap second
+            datetime(2016, 12, 31, 18, 0, 0, tzinfo=timezone.utc),
+            datetime(1969, 12, 31, 23, 59, 59, 500000, tzinfo=timezone.utc),
+        ],
+        type=pa.timestamp("us", tz="UTC"),
+    )
+    expected = Timestamp.from_astropy(
+        Time(times.to_numpy(zero_copy_only=False), format="datetime64", scale="utc")
+    )
+
+    actual = timestamp_from_arrow(times)
+
+    assert actual.scale == "utc"
+    np.testing.assert_array_equal(actual.days, expected.days)
+    np.testing.assert_allclose(
+        actual.nanos.to_numpy(), expected.nanos.to_numpy(), rtol=0, atol=1000
+    )
+
+
+def test_timestamp_from_arrow_nulls() -> None:
+    times = pa.chunked_array(
+        [
+            pa.array(
+                [datetime(2024, 3, 1, tzinfo=timezone.utc), None],
+                type=pa.timestamp("us", tz="UTC"),
+            )
+        ]
+    )
+
+    actual = timestamp_from_arrow(times)
+
+    assert actual.days.to_pylist() == [60370, None]
+    assert actual.nanos.to_pylist() == [0, None]
+    assert len(timestamp_from_arrow(times.slice(0, 0))) == 0
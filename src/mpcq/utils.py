@@ -0,0 +1,100 @@
+import warnings
+
+import erfa
+import numpy as np
+import numpy.typing as npt
+import pyarrow as pa
+import pyarrow.compute as pc
+from adam_core.time import Timestamp
+
+# MJD of the Unix epoch (1970-01-01T00:00:00)
+MJD_UNIX_EPOCH = 40587
+SECONDS_PER_DAY = 86400
+MICROS_PER_DAY = SECONDS_PER_DAY * 1_000_000
+
+
+def utc_day_lengths(days: npt.NDArray[np.int64]) -> npt.NDArray[np.float64]:
+    """
+    Length in seconds of each UTC day, including any leap second inserted at its end.
+
+    This follows the convention used by ERFA (and therefore astropy), where the
+    fraction of a UTC day is measured against the length of that particular day.
+
+    Parameters
+    ----------
+    days : np.ndarray
+        Integer MJDs of the UTC days.
+
+    Returns
+    -------
+    day_lengths : np.ndarray
+        Length of each day in seconds.
+    """
+    with warnings.catch_warnings():
+        # ERFA warns about "dubious years" before 1960 and in the far future,
+        # where no leap seconds are defined
+        warnings.simplefilter("ignore", erfa.ErfaWarning)
+        year, month, day, _ = erfa.jd2cal(2400000.5, days.astype(np.float64))
+        year_next, month_next, day_next, _ = erfa.jd2cal(2400000.5, days + 1.0)
+        dat_start = erfa.dat(year, month, day, 0.0)
+        dat_noon = erfa.dat(year, month, day, 0.5)
+        dat_end = erfa.dat(year_next, month_next, day_next, 0.0)
+
+    # Remove any drift in TAI-UTC (pre-1972) so only steps at the end of the day remain
+    leap = dat_end - (2.0 * dat_noon - dat_start)
+    return np.asarray(SECONDS_PER_DAY + leap, dtype=np.float64)
+
+
+def timestamp_from_arrow(
+    times: pa.Array | pa.ChunkedArray, scale: str = "utc"
+) -> Timestamp:
+    """
+    Convert an Arrow timestamp array (such as a BigQuery TIMESTAMP column) to a
+    Timestamp without constructing an intermediate astropy Time.
+
+    Arrow timestamps count seconds since the Unix epoch, ignoring leap seconds, so they
+    split into days and nanoseconds since the MJD epoch with integer arithmetic. On
+    days that end in a leap second the time of day is rescaled to match the ERFA
+    convention used by Timestamp.from_astropy. Null values are kept as nulls.
+
+    Parameters
+    ----------
+    times : pa.Array or pa.ChunkedArray
+        Arrow timestamps.
+    scale : str, optional
+        Time scale of the timestamps.
+
+    Returns
+    -------
+    timestamp : Timestamp
+        The converted timestamps.
+    """
+    micros = pc.cast(times, pa.timestamp("us", tz=times.type.tz), safe=False)
+    micros = pc.cast(micros, pa.int64())
+
+    # Only build a validity mask (and fill the nulls) when there are nulls, so
+    # fully-populated columns are converted without the extra copies
+    mask = None
+    if micros.null_count > 0:
+        mask = pc.is_null(micros).to_numpy(zero_copy_only=False)
+        micros = pc.fill_null(micros, 0)
+    values = micros.to_numpy(zero_copy_only=False)
+
+    days, nanos = np.divmod(values, MICROS_PER_DAY)
+    days += MJD_UNIX_EPOCH
+    nanos *= 1000
+
+    if scale == "utc" and len(days) > 0:
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        day_lengths = utc_day_lengths(unique_days)[inverse]
+        leap_days = day_lengths != SECONDS_PER_DAY
+        if np.any(leap_days):
+            nanos[leap_days] = np.round(
+                nanos[leap_days] * (SECONDS_PER_DAY / day_lengths[leap_days])
+            ).astype(np.int64)
+
+    return Timestamp.from_kwargs(
+        days=pa.array(days, mask=mask),
+        nanos=pa.array(nanos, mask=mask),
+        scale=scale,
+    )